@@ -14,7 +14,7 @@ This way, the script can be used in shell files too
 __author__ = "Simon Gunacker"
 __copyright__ = "Copyright 2018, Graz"
 
-import os, cmd, socket
+import cmd, socket
 from latex import *
 from colorama import Fore, Back, Style, init
 import argparse
@@ -74,7 +74,7 @@ class StatsShell(cmd.Cmd):
         'sends command to server'
         clientsocket = socket.socket()
         clientsocket.connect( ('127.0.0.1', 1234) )
-        clientsocket.send(arg.encode())
+        clientsocket.sendall((arg + "\n").encode())
         clientsocket.close()
 
     def do_bye(self, arg):
@@ -83,7 +83,7 @@ class StatsShell(cmd.Cmd):
         return True
 
 if __name__ == "__main__":
-    os.system("cls")
+    clear_screen()
     parser = argparse.ArgumentParser()
     parser.add_argument("-s", "--send", help="sends a command to server directly", type=str)
     args = parser.parse_args()
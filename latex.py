@@ -23,7 +23,8 @@ Note:
 __author__ = "Simon Gunacker"
 __copyright__ = "Copyright 2018, Graz"
 
-import re, os, pickle, datetime
+import re, os, pickle, datetime, functools, hashlib
+from collections import defaultdict
 from colorama import Fore, Back, Style, init
 from config import PROJECT_PATH
 
@@ -38,6 +39,7 @@ CHAPTERS = "%s\\chapters" % PROJECT_PATH
 FIGURES = "%s\\figures" % PROJECT_PATH
 BIBLOG = "%s\\auxil\\main.blg" % PROJECT_PATH
 MAINLOG = "%s\\auxil\\main.log" % PROJECT_PATH
+SOURCES = [AUXPATH, BIBPATH, TOCPATH, LOFPATH, LOTPATH, CHAPTERS, FIGURES, BIBLOG, MAINLOG]
 
 # path to data directory storing statistics
 DATADIR = "."
@@ -49,22 +51,28 @@ init(autoreset=True)
 DATE = datetime.datetime.now().isoformat()[:10]
 DATAFILE = os.path.join(DATADIR, "snapshot-{}.pkl".format(DATE))
 
+# parse results cached by mtime_pkl_cache. Cached results are only valid for the code (patterns, parsers) that produced them,
+# so any change to this file invalidates them
+CACHEDIR = os.path.join(DATADIR, "cache")
+with open(__file__, 'rb') as source:
+    CACHE_VERSION = hashlib.md5(source.read()).hexdigest()
+
+# read buffer used when parsing files (logs and aux files may get large)
+BUFFERSIZE = 1 << 16
+
 # These patterns are used by the parsers to extract the needed information
-CHAPTER = r"\\contentsline \{(chapter)\}\{\\numberline \{(\d+)\}(.*)\}\{(\d+)\}.*"
-SECTION = r"\\contentsline \{(section)\}\{\\numberline \{(\d+.\d+)+\}(.*)\}\{(\d+)\}.*"
-SUBSECTION = r"\\contentsline \{(subsection)\}\{\\numberline \{(\d+.\d+.\d+)+\}(.*)\}\{(\d+)\}.*"
-FIGURE = r"\\contentsline \{figure\}\{\\numberline \{(\d+.\d+)\}\{\\ignorespaces (.*)\}\}\{(\d+)\}.*"
-TABLE = r"\\contentsline \{table\}\{\\numberline \{(\d+.\d+)\}\{\\ignorespaces (.*)\}\}\{(\d+)\}.*"
-REFERENCE = r"@.*\{(.*),"
-CITATION = r".*@cite\{(.*)\}"
-TEXCHAPTER = r"\\chapter\{(.*)\}"
-TEXSECTION = r"\\section\{(.*)\}"
-TEXSUBSECTION = r"\\subsection\{(.*)\}"
-TEXFIGURES = r".*\\includegraphics.*\{(.*)\}.*"
-BIBLOGWARN = r".*WARN - (.*) -.*"
-MAINLOGWARN1 = r"(.*)Warning(.*)"
-MAINLOGWARN2 = r"(.*)warning(.*)"
-MAINLOGERR = r"(.*)Error(.*)"
+CHAPTER = re.compile(r"\\contentsline \{(chapter)\}\{\\numberline \{(\d+)\}(.*)\}\{(\d+)\}")
+SECTION = re.compile(r"\\contentsline \{(section)\}\{\\numberline \{(\d+\.\d+)\}(.*)\}\{(\d+)\}")
+SUBSECTION = re.compile(r"\\contentsline \{(subsection)\}\{\\numberline \{(\d+\.\d+\.\d+)\}(.*)\}\{(\d+)\}")
+FIGURE = re.compile(r"\\contentsline \{figure\}\{\\numberline \{(\d+\.\d+)\}\{\\ignorespaces (.*)\}\}\{(\d+)\}")
+TABLE = re.compile(r"\\contentsline \{table\}\{\\numberline \{(\d+\.\d+)\}\{\\ignorespaces (.*)\}\}\{(\d+)\}")
+REFERENCE = re.compile(r"@\w+\s*\{\s*([^,\s]*)\s*,")
+CITATION = re.compile(r".*@cite\{(.*)\}")
+TEXCAPTION = re.compile(r"^\\(?:chapter|section|subsection)\{(.*)\}", re.MULTILINE)
+TEXFIGURES = re.compile(r".*\\includegraphics\*?\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}")
+BIBLOGWARN = re.compile(r".*WARN - (.*) -")
+MAINLOGKEYWORDS = ["Warning", "warning", "Error"]
+SKIPBLOCKS = re.compile(r"\\begin\{((?:align|equation|figure|table)\*?)\}.*?\\end\{\1\}|\$\$.*?\$\$", re.DOTALL)
 
 # windows hack for keeping window on top (https://stackoverflow.com/questions/3926655)
 def window_always_on_top():
@@ -77,6 +85,58 @@ def window_always_on_top():
     except StopIteration:
         pass
 
+# clears the console using ANSI escape sequences (translated by colorama on windows) instead of spawning "cls"
+def clear_screen():
+    print("\x1b[2J\x1b[H", end="")
+
+def memoize(method):
+    """
+    caches the result of a parameterless method in the _cache dict of its instance, 
+    so files are parsed at most once per instance no matter how often the method is called
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        if method not in self._cache:
+            self._cache[method] = method(self)
+        return self._cache[method]
+    return wrapper
+
+def fingerprint(path):
+    """
+    :returns the modification time of a file, the names and modification times of all files in a dir or None if path does not exist
+    :param path: the file or dir to fingerprint
+    """
+    if os.path.isdir(path):
+        return tuple(sorted((filename, os.stat(filepath).st_mtime_ns) for filename, filepath in Files(path)))
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+
+def mtime_pkl_cache(source):
+    """
+    caches the result of a parameterless method in a pickle file in CACHEDIR.
+    as long as neither the fingerprint of source nor CACHE_VERSION change, the result is loaded from that file instead of parsing source again.
+
+    :param source: the file or dir the method parses
+    """
+    cachefile = os.path.join(CACHEDIR, "cache-{}.pkl".format(hashlib.md5(source.encode()).hexdigest()))
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            current = fingerprint(source)
+            try:
+                with open(cachefile, 'rb') as cache:
+                    version, cached, result = pickle.load(cache)
+                if version == CACHE_VERSION and cached == current:
+                    return result
+            except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                pass
+            result = method(self)
+            os.makedirs(CACHEDIR, exist_ok=True)
+            with open(cachefile, 'wb') as cache:
+                pickle.dump((CACHE_VERSION, current, result), cache, protocol=pickle.HIGHEST_PROTOCOL)
+            return result
+        return wrapper
+    return decorator
+
 class AbstractParser(object):
     """
     Parses a file line by line.
@@ -99,48 +159,88 @@ class AbstractParser(object):
         # after the file is opened, each line is parsed by _parse
         # _parse returns an entry containing relevant information or None if line did not match the given pattern
         # all None-objects are filtered before the list is returned
-        with open(file, encoding='utf-8') as f:
-            return list(filter(lambda item: item is not None, [ self._parse(line) for line in f.readlines() ]))
+        with open(file, encoding='utf-8', buffering=BUFFERSIZE) as f:
+            return list(filter(lambda item: item is not None, (self._parse(line) for line in f)))
 
 class Parser(AbstractParser):
     """
     Parses a file line by line and extracts relevant information based on given patterns.
     """
 
+    # numbered backreferences (\1, ...) that are not escaped themselves
+    _BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]")
+
     def __init__(self, patterns):
         """
-        :param patterns: a list of patterns. Each pattern is applied on each line.
+        :param patterns: a list of compiled patterns. Each pattern is applied on each line.
+                         Patterns must not use flags or numbered backreferences as they are fused into a single pattern.
         """
+        for pattern in patterns:
+            # flags would get lost and group numbers are shifted when fusing the patterns
+            if pattern.flags & ~re.UNICODE:
+                raise ValueError("pattern must not use flags: {}".format(pattern.pattern))
+            if self._BACKREFERENCE.search(pattern.pattern):
+                raise ValueError("pattern must not use numbered backreferences: {}".format(pattern.pattern))
         self.patterns = patterns
 
+        # all patterns are fused into a single alternation (?P<p0>...)|(?P<p1>...)|... so each line is matched once.
+        # _groups maps the name of each alternative to the range of its own groups within the fused pattern
+        self._groups, offset = {}, 1
+        for i, pattern in enumerate(patterns):
+            self._groups["p%d" % i] = (offset + 1, offset + 1 + pattern.groups)
+            offset += pattern.groups + 1
+        self.combined = re.compile("|".join("(?P<p%d>%s)" % (i, pattern.pattern) for i, pattern in enumerate(patterns)))
+
     def _parse(self, line):
         """
         :returns an entry containing relevant information or None if line does not match any pattern
         :param line: the current line the patterns are applied to
         """
-        # matched_patterns is a list of matches found for a single line. Each line is supposed to have at most one match
-        matched_patterns = map(lambda pattern: re.match(pattern, line), self.patterns)
+        # each line is supposed to have at most one match, so the first matching alternative wins
+        match = self.combined.match(line)
+        if match is None:
+            return None
+        start, end = self._groups[match.lastgroup]
+        return match.groups()[start - 1:end - 1]
 
-        # matching_pattern is either an empty list if no pattern matches or a list containing the one match that has been found
-        matching_pattern = list(filter(lambda matched: matched is not None, matched_patterns))
+class KeywordParser(AbstractParser):
+    """
+    Parses a file line by line and splits each line at a literal keyword.
+    Used instead of patterns like (.*)Warning(.*) as a substring search is a lot cheaper than a regex.
+    """
 
-        # entry is none if no pattern matched the current line. Otherwise, entry contains a list of relevant information extracted from the line
-        entry = matching_pattern[0].groups() if len(matching_pattern) > 0 else None
+    def __init__(self, keywords):
+        """
+        :param keywords: a list of keywords. The first keyword found in a line is used to split it.
+        """
+        self.keywords = keywords
 
-        return entry
+    def _parse(self, line):
+        """
+        :returns (text before keyword, text after keyword) or None if line does not contain any keyword
+        :param line: the current line the keywords are searched in
+        """
+        line = line.rstrip("\n")
+        for keyword in self.keywords:
+            # split at the last occurrence, just like the greedy (.*) of the former patterns did
+            i = line.rfind(keyword)
+            if i >= 0:
+                return line[:i], line[i + len(keyword):]
+        return None
 
 class Files(object):
     """
-    an os.listdir abstraction yielding both, the filename and the full path of all files (not dirs) in a directory
+    an os.scandir abstraction yielding both, the filename and the full path of all files (not dirs) in a directory
     """
     def __init__(self, path):
         self.path = path
     
     def __iter__(self):
-        _fileinfo = lambda filename: (filename, os.path.join(self.path, filename))
-        _is_path = lambda fileinfo: os.path.isfile(fileinfo[1])
-
-        yield from filter(_is_path, map(_fileinfo, os.listdir(self.path)))
+        # DirEntry.is_file() uses the file type stored in the dir entry and usually doesn't need an extra stat call
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.name, entry.path
 
 class DirParser(Parser):
     """
@@ -156,11 +256,14 @@ class DirParser(Parser):
 
         :returns all entries found in any file, format { filename: [ entries* ] }
         """
-        # TODO: can this be reduced to a single iteration?
-        results = { filename: super(DirParser, self).parse(filepath) for filename, filepath in Files(self.path) }
-        return { filename: entries for filename, entries in results.items() if len(entries) > 0 }
+        results = {}
+        for filename, filepath in Files(self.path):
+            entries = super(DirParser, self).parse(filepath)
+            if len(entries) > 0:
+                results[filename] = entries
+        return results
 
-class WordCounter(DirParser):
+class WordCounter(object):
     """
     Parses all chapters to find the number of words per chapter.
 
@@ -173,10 +276,9 @@ class WordCounter(DirParser):
         inits the WordCounter. After initialization, the WordCounter contains a dict of all 
         words written for any section and the corresponding file
 
-        :param path: see DirParser
-        :param patterns: see DirParser
+        :param path: the dir containing one file per chapter
         """
-        super(WordCounter, self).__init__(path, [TEXCHAPTER, TEXSECTION, TEXSUBSECTION])
+        self.path = path
         self.maxwords = -1
         self.entries = self.count_all_words()
 
@@ -189,26 +291,32 @@ class WordCounter(DirParser):
 
         :returns a dict of counts { caption -> {file: <FILENAME>, words: <NUMBER_OF_WORDS> } }
         """
-        # remodel dict
+        # each file is read once: the caption is taken from the first heading, the words are counted from the same text
         result = {}
-        for filename, entries in self.parse().items():
-            caption, words = entries[0][0], self.count_words(filename)
+        for filename, filepath in Files(self.path):
+            with open(filepath, encoding='utf-8', buffering=BUFFERSIZE) as f:
+                text = f.read()
+            caption = TEXCAPTION.search(text)
+            if caption is None:
+                continue
+            words = self._count_words(text)
             self.maxwords = words if words > self.maxwords else self.maxwords
-            result[caption] = { "file": filename, "words": words }
+            result[caption.group(1)] = { "file": filename, "words": words }
         return result
 
-    def count_words(self, filename):
-        # return len(open(os.path.join(self.path, filename),'r').read().split())
-        words, skip_line, skipterms = 0, False, ["$$", "{align", "{equation}", "{figure}", "{table}"]
-        with open(os.path.join(self.path, filename), 'r') as f:
-            for line in f.readlines():
-                if any(map(lambda term: term in line, skipterms)):
-                    skip_line = not skip_line
-                if not skip_line:
-                    #if filename=="323-visualization.tex":
-                    #    print(line)
-                    words += len(line.split())
-        return words
+    def _count_words(self, text):
+        """
+        counts the words of a text, skipping equations, figures and tables
+
+        :returns the number of words
+        :param text: the text to count the words for
+        """
+        # only the ranges between skipped blocks are counted, so no masked copy of the whole text is built
+        words, start = 0, 0
+        for block in SKIPBLOCKS.finditer(text):
+            words += len(text[start:block.start()].split())
+            start = block.end()
+        return words + len(text[start:].split())
 
 class AbstractFormatter(object):
     """
@@ -217,13 +325,21 @@ class AbstractFormatter(object):
     This class is not supposed to be instantiated. Subclasses should implement the _format method
     """
 
+    # escape sequences used for colorful output (concatenated once instead of on every call)
+    _RESET = Style.RESET_ALL + Fore.WHITE
+    _GREEN = Fore.GREEN + Style.BRIGHT
+    _RED = Fore.RED + Style.BRIGHT
+    _GRAY = Fore.BLACK + Style.BRIGHT
+    _YELLOW = Fore.YELLOW + Style.BRIGHT
+    _BROWN = Fore.YELLOW + Style.DIM
+
     # some methods to produce colorful output
-    _color = lambda self, text: str(text) + Style.RESET_ALL + Fore.WHITE
-    _green = lambda self, text: Fore.GREEN + Style.BRIGHT + self._color(text)
-    _red = lambda self, text: Fore.RED + Style.BRIGHT + self._color(text)
-    _gray = lambda self, text: Fore.BLACK + Style.BRIGHT + self._color(text)
-    _yellow = lambda self, text: Fore.YELLOW + Style.BRIGHT + self._color(text)
-    _brown = lambda self, text: Fore.YELLOW + Style.DIM + self._color(text)
+    _color = lambda self, text: f"{text}{self._RESET}"
+    _green = lambda self, text: f"{self._GREEN}{text}{self._RESET}"
+    _red = lambda self, text: f"{self._RED}{text}{self._RESET}"
+    _gray = lambda self, text: f"{self._GRAY}{text}{self._RESET}"
+    _yellow = lambda self, text: f"{self._YELLOW}{text}{self._RESET}"
+    _brown = lambda self, text: f"{self._BROWN}{text}{self._RESET}"
 
     # Implement this method in any subclass
     # called on each item of the list
@@ -233,8 +349,10 @@ class AbstractFormatter(object):
         """
         Shows formatted output.
         """
-        print(self._red(caption)+"\n") if len(list(iterable)) > 0 else None
-        for i, item in enumerate(iterable, start=1):
+        # materialize once: iterable may be a generator (e.g. Tree) that can't be iterated twice
+        items = list(iterable)
+        print(self._red(caption)+"\n") if len(items) > 0 else None
+        for i, item in enumerate(items, start=1):
             print(self._format(i, item))
         print()
 
@@ -243,6 +361,7 @@ class ConstantWidthFormatter(AbstractFormatter):
     Formats a list of entries in form <_indent()><_left()> ....... <_right()>
     """
     _WIDTH = 100
+    _DOTS = "." * _WIDTH
 
     # Implement these methods in subclasses
     _indent = lambda self, item: 0
@@ -259,7 +378,7 @@ class ConstantWidthFormatter(AbstractFormatter):
         :param item: the item (which is usually a list containing information that has to be splitted by subclasses using abstract functions)
         """
         indent, left, right, extend = self._indent(item), self._left(item), self._right(item), self._extend(item)
-        dots = "." * (self._WIDTH - indent - len(left) - len(right) - 2) 
+        dots = self._DOTS[:max(self._WIDTH - indent - len(left) - len(right) - 2, 0)]
         return "{0} {1} {2} {3} {4}".format(" " * indent, left, self._gray(dots), right, extend)
 
 class EnumerationFormatter(AbstractFormatter):
@@ -269,7 +388,8 @@ class EnumerationFormatter(AbstractFormatter):
     _format = lambda self, i, item: self._gray("{:4d}. {}".format(i, item))
 
     def show(self, iterable, caption="", order=lambda iterable: iterable):
-        super(EnumerationFormatter, self).show(order(iterable), caption="{} ({}):".format(caption, len(list(iterable))))
+        items = list(order(iterable))
+        super(EnumerationFormatter, self).show(items, caption="{} ({}):".format(caption, len(items)))
 
 class MainlogFormatter(EnumerationFormatter):
     """
@@ -305,18 +425,27 @@ class TocFormatter(ConstantWidthFormatter):
     Lists toc tree with some statistics for each section
     """
     _INDENTS = [0, 3, 8]
+
+    # progress bars are colored once for every length from 0 to 50 and looked up by percent.
+    # _SPACES[n:] pads a bar of length n to the full width of 50
+    _YELLOW_BARS = [AbstractFormatter._YELLOW + "=" * n + AbstractFormatter._RESET for n in range(51)]
+    _BROWN_BARS = [AbstractFormatter._BROWN + "=" * n + AbstractFormatter._RESET for n in range(51)]
+    _BAR_OPEN = AbstractFormatter._GRAY + " [" + AbstractFormatter._RESET
+    _BAR_CLOSE = AbstractFormatter._GRAY + "]" + AbstractFormatter._RESET
+    _SPACES = " " * 50
+
     _indent = lambda self, item: self._INDENTS[item[0]]
     _left = lambda self, item: "{0}. {1}".format(item[1], item[2])
     _right = lambda self, item: "{}".format(item[3])
     _extend = lambda self, item: (self._words(item) + self._percent(item)) if item[4] > 10 else ""
     _words = lambda self, item: self._gray(" ({:>5} words)".format(item[4]))
-    _percent = lambda self, item: self._gray(" [") + self._yellow("=" * item[5]).ljust(50 + len(self._yellow(""))) + self._gray("]")  
+    _percent = lambda self, item: self._BAR_OPEN + self._YELLOW_BARS[item[5]] + self._SPACES[item[5]:] + self._BAR_CLOSE
 
 class DiffTocFormatter(TocFormatter):
     """
     Lists toc tree and shows changes of the day
     """
-    _sumpercent = lambda self, oldamount, newamount: self._brown("=" * oldamount) + Style.RESET_ALL + self._yellow("=" * newamount) 
+    _sumpercent = lambda self, oldamount, newamount: self._BROWN_BARS[oldamount] + Style.RESET_ALL + self._YELLOW_BARS[newamount]
 
     # _percent and _words get unreadable using a lambda expression ;-)
     def _words(self, item):
@@ -337,11 +466,8 @@ class DiffTocFormatter(TocFormatter):
 
         :param item: the item containing overall and new words
         """
-        left, right = self._gray(" ["), self._gray("]")
-        old, new = item[7], int(item[5] - item[7])
-        bar = self._sumpercent(old, new)
-        empty_bar_len = len(self._sumpercent(0, 0)) # this is not 0 as colors are used!
-        return left + bar.ljust(50 + empty_bar_len) + right
+        old, new = item[7], max(int(item[5] - item[7]), 0)
+        return self._BAR_OPEN + self._sumpercent(old, new) + self._SPACES[old + new:] + self._BAR_CLOSE
 
 # parsing the list would be sufficient in our case but the tree might allow us to compute
 # sums of words recursively.
@@ -356,25 +482,18 @@ class Tree(object):
     # internal properties 
     number_of_nodes = 0
 
-    # helper functions: get item information, check if item is child of another item
+    # helper functions: get item information. The key of an item is its number as tuple of ints ("3.2.1" -> (3, 2, 1))
     _get_number = lambda self, item: item[1]
-    _get_level = lambda self, item: self._get_number(item).count('.')
-    _get_type = lambda self, item: item[0]
-    _get_words = lambda self, item: item[3]
-    _get_percent = lambda self, item: item[4]
-    _is_chapter = lambda self, item: self._get_type(item) == 'chapter'
-    _is_descendant = lambda self, item, candidate: self._get_number(candidate).startswith(self._get_number(item))
-    _is_next_generation = lambda self, item, candidate: self._get_level(candidate) == self._get_level(item) + 1
-    _is_child_of_item = lambda self, item, candidate: self._is_descendant(item, candidate) and self._is_next_generation(item, candidate) 
-    _is_child = lambda self, item, candidate: self._is_chapter(candidate) if item is None else self._is_child_of_item(item, candidate)
+    _get_key = lambda self, item: tuple(int(part) for part in self._get_number(item).split('.'))
 
     def __init__(self, table_of_content):
         """
-        Initializes the toc tree by generating the tree, the lookuptable and by initializing the word counter
+        Initializes the toc tree by indexing the children of each entry, generating the tree, the lookuptable and by initializing the word counter
 
         :param table_of_content: the list of toc entries that is converted into a tree
         """
-        self.tree = self.generate_tree(table_of_content)
+        self.children = self.index_children(table_of_content) # init __before__ tree!!
+        self.tree = self.generate_tree()
         self.wc = WordCounter(CHAPTERS) # init __before__ lut!!
         self.lut = self.generate_lut(table_of_content)
 
@@ -384,26 +503,38 @@ class Tree(object):
     def __len__(self): 
         return self.number_of_nodes
     
-    def get_children(self, table_of_content, node=None):
+    def index_children(self, table_of_content):
         """
-        :returns a list of children for a given node or a list of root nodes if node=None
+        :returns a dict { parent key -> [ (key, child)* ] }. Chapters (root nodes) are listed under the empty key ()
         :param table_of_content: the list of toc entries
-        :param node: the node to find the children for
         """
-        return [item for item in table_of_content if self._is_child(node, item)]
+        children = defaultdict(list)
+        for item in table_of_content:
+            key = self._get_key(item)
+            children[key[:-1]].append((key, item))
+        return children
+
+    def get_children(self, key=()):
+        """
+        :returns a list of (key, child) pairs for a given node key or a list of root nodes if key=()
+        :param key: the key of the node to find the children for
+        """
+        return self.children.get(key, [])
 
-    def generate_tree(self, table_of_content, tree={}, current_node=None):
+    def generate_tree(self, tree=None, current_key=()):
         """
         :returns a tree of numbers of toc entries
-        :param table_of_content: the list containing all toc entries
         :param tree: the (current) (sub)tree to append children to
-        :param current_node: the current child to find children for
+        :param current_key: the key of the current child to find children for
         """
-        for child in self.get_children(table_of_content, current_node):
+        tree = {} if tree is None else tree
+
+        # children are looked up by their parent's key (see index_children) instead of scanning the whole toc for each node
+        for key, child in self.get_children(current_key):
             number = self._get_number(child)
             tree[number] = {}
             self.number_of_nodes += 1
-            self.generate_tree(table_of_content, tree[number], child)
+            self.generate_tree(tree[number], key)
         return tree
 
     def generate_lut(self, table_of_content):
@@ -419,15 +550,26 @@ class Tree(object):
             lut[self._get_number(item)] = (number, caption, page, words, percent)
         return lut
 
-    def get_tree(self, tree=None, level=0):
+    def get_words(self):
         """
-        yields next tree node. Used by __iter__(self).
+        :returns a dict { number -> (words, percent) }. This is all DiffTree needs from a snapshot
         """
-        tree = self.tree if tree is None else tree
-        for number in tree:
-            yield (level, *self.lut[number])
-            if len(tree[number]) > 0:
-                yield from self.get_tree(tree=tree[number], level=level+1)
+        return { number: (words, percent) for number, (_, _, _, words, percent) in self.lut.items() }
+
+    def get_tree(self):
+        """
+        yields next tree node (depth first). Used by __iter__(self).
+        """
+        # explicit stack of (sub)tree iterators instead of recursive generators; the level is the depth of the stack
+        stack = [iter(self.tree.items())]
+        while stack:
+            number, subtree = next(stack[-1], (None, None))
+            if number is None:
+                stack.pop()
+                continue
+            yield (len(stack) - 1, *self.lut[number])
+            if len(subtree) > 0:
+                stack.append(iter(subtree.items()))
 
 class DiffTree(Tree):
     """
@@ -440,38 +582,52 @@ class DiffTree(Tree):
         inits DiffTree
 
         :param table_of_content: the table to be converted into a tree
-        :param diff: a snapshot of all stats when first started at the current day
+        :param diff: words and percent per section when first started at the current day, format { number -> (words, percent) } (see Tree.get_words)
         """
         super(DiffTree, self).__init__(table_of_content)
         self.diff = diff
 
     def __iter__(self):
+        if self.diff is None:
+            yield from self.get_tree()
+            return
+
         for level, number, caption, page, words, percent in self.get_tree():
-            if self.diff is None:
-                yield level, number, caption, page, words, percent
-            else:
-                oldwords = self.diff._get_words(self.diff.lut[number])
-                oldpercent = self.diff._get_percent(self.diff.lut[number])
-                yield (level, number, caption, page, words, percent, oldwords, oldpercent)
+            oldwords, oldpercent = self.diff[number]
+            yield (level, number, caption, page, words, percent, oldwords, oldpercent)
 
 class Statistics(object):
     """
     Defines methods for printing latex statistics
     """
 
-    _parse_table_of_content = lambda self: Parser([CHAPTER, SECTION, SUBSECTION]).parse(TOCPATH)
-    _parse_list_of_figures = lambda self: Parser([FIGURE]).parse(LOFPATH)
-    _parse_list_of_tables = lambda self: Parser([TABLE]).parse(LOTPATH)
-    _parse_references = lambda self: set([ref[0] for ref in Parser([REFERENCE]).parse(BIBPATH)])
-    _parse_citations = lambda self: set([cit[0] for cit in Parser([CITATION]).parse(AUXPATH)])
-    _parse_biblog = lambda self: list([warn[0] for warn in Parser([BIBLOGWARN]).parse(BIBLOG)])
-    _parse_mainlog = lambda self: list(filter(lambda entry: "Package:" not in entry[0], Parser([MAINLOGWARN1, MAINLOGWARN2, MAINLOGERR]).parse(MAINLOG)))
-    _parse_used_figures = lambda self: set([figure[0][len('figures/'):] for figures in DirParser(CHAPTERS, [TEXFIGURES]).parse().values() for figure in figures])
-    _parse_avail_figures = lambda self: set([filename.split('.')[0] for filename, _ in Files(FIGURES)])
-    _compute_used_references = lambda self: self._parse_references() & self._parse_citations()
-    _compute_unused_references = lambda self: self._parse_references() - self._compute_used_references()
-    _compute_undefined_references = lambda self: self._parse_citations() - self._compute_used_references()
-    _compute_unused_figures = lambda self: self._parse_avail_figures() - self._parse_used_figures()
+    _parse_table_of_content = memoize(mtime_pkl_cache(TOCPATH)(lambda self: Parser([CHAPTER, SECTION, SUBSECTION]).parse(TOCPATH)))
+    _parse_list_of_figures = memoize(mtime_pkl_cache(LOFPATH)(lambda self: Parser([FIGURE]).parse(LOFPATH)))
+    _parse_list_of_tables = memoize(mtime_pkl_cache(LOTPATH)(lambda self: Parser([TABLE]).parse(LOTPATH)))
+    _parse_references = memoize(mtime_pkl_cache(BIBPATH)(lambda self: frozenset(ref[0] for ref in Parser([REFERENCE]).parse(BIBPATH))))
+    _parse_citations = memoize(mtime_pkl_cache(AUXPATH)(lambda self: frozenset(cit[0] for cit in Parser([CITATION]).parse(AUXPATH))))
+    _parse_biblog = memoize(mtime_pkl_cache(BIBLOG)(lambda self: list([warn[0] for warn in Parser([BIBLOGWARN]).parse(BIBLOG)])))
+    _parse_mainlog = memoize(mtime_pkl_cache(MAINLOG)(lambda self: list(filter(lambda entry: "Package:" not in entry[0], KeywordParser(MAINLOGKEYWORDS).parse(MAINLOG)))))
+    _parse_used_figures = memoize(mtime_pkl_cache(CHAPTERS)(lambda self: frozenset(figure[0][len('figures/'):] for figures in DirParser(CHAPTERS, [TEXFIGURES]).parse().values() for figure in figures)))
+    _parse_avail_figures = memoize(mtime_pkl_cache(FIGURES)(lambda self: frozenset(filename.split('.')[0] for filename, _ in Files(FIGURES))))
+    _compute_unused_references = memoize(lambda self: self._parse_references() - self._parse_citations())
+    _compute_undefined_references = memoize(lambda self: self._parse_citations() - self._parse_references())
+    _compute_unused_figures = memoize(lambda self: self._parse_avail_figures() - self._parse_used_figures())
+
+    def __init__(self):
+        # results of the memoized _parse_*/_compute_* methods, see memoize()
+        self._cache = {}
+        self._fingerprints = None
+
+    def refresh(self):
+        """
+        drops all memoized results if any of the parsed files changed since the last refresh.
+        Results of unchanged files are then restored from their pickle cache (see mtime_pkl_cache) instead of being parsed again.
+        """
+        fingerprints = [fingerprint(source) for source in SOURCES]
+        if fingerprints != self._fingerprints:
+            self._cache.clear()
+            self._fingerprints = fingerprints
 
     def print_table_of_content(self):
         self._print_table_of_content() if not os.path.isfile(DATAFILE) else self._print_diff_table_of_content()
@@ -506,26 +662,31 @@ class Statistics(object):
             self.backup(DATAFILE)
 
     def backup(self, path):
+        # only plain data is stored (no Tree), which keeps snapshots small and fast to load
+        table_of_content = self._parse_table_of_content()
         with open(path, 'wb') as snapshot: pickle.dump({
-                "table-of-content": Tree(self._parse_table_of_content()),
+                "table-of-content": table_of_content,
+                "words": Tree(table_of_content).get_words(),
                 "list-of-figures": self._parse_list_of_figures(),
                 "list-of-tables": self._parse_list_of_tables(),
                 "references": self._parse_references(),
                 "citations": self._parse_citations(),
                 "used-figures": self._parse_used_figures(),
                 "avail-figures": self._parse_avail_figures()
-            }, snapshot)
+            }, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
 
     def _print_table_of_content(self):
         TocFormatter().show(Tree(self._parse_table_of_content()), "Table of content")
 
     def _print_diff_table_of_content(self):
         with open(DATAFILE, 'rb') as snapshot: 
-            info = pickle.load(snapshot)["table-of-content"]
-            DiffTocFormatter().show(DiffTree(self._parse_table_of_content(), diff=info), "Table of content")
+            info = pickle.load(snapshot)
+            # snapshots written before "words" was introduced contain the whole Tree instead
+            words = info["words"] if "words" in info else info["table-of-content"].get_words()
+            DiffTocFormatter().show(DiffTree(self._parse_table_of_content(), diff=words), "Table of content")
 
 if __name__ == '__main__':
-    os.system("cls")
+    clear_screen()
     stats = Statistics()
     stats.print_table_of_content()
     stats.print_list_of_figures()
@@ -8,7 +8,7 @@ server.py: uses Statstics class from latex.py and plots statistics. Use in combi
 __author__ = "Simon Gunacker"
 __copyright__ = "Copyright 2018, Graz"
 
-import socket, os
+import socket
 from latex import *
 from colorama import Fore, Back, Style, init
             
@@ -20,8 +20,10 @@ class StatsServer(object):
         super(StatsServer, self).__init__()
         self.serversock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.serversock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.serversock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         self.serversock.bind( (self._HOST, self._PORT) )
         self.serversock.listen(1)
+        self.stats = Statistics()
         self.print("Welcome. Server is running on {}:{}. Awaiting requests ...".format(self._HOST, self._PORT))
 
     def print(self, text):
@@ -33,30 +35,35 @@ class StatsServer(object):
             self.handle_request(clientsock, addr)
 
     def handle_request(self, clientsock, addr):
-        while True:
-            data = clientsock.recv(1024)
-            if not data: 
-                break
-            data = data.decode()
-            os.system("cls")
-            if data == "toc":
-                Statistics().print_table_of_content()
-            elif data == "lot":
-                Statistics().print_list_of_tables()
-            elif data == "lof":
-                Statistics().print_list_of_figures()
-            elif data == "unu" or data == "unu refs":
-                Statistics().print_unused_references()
-            elif data == "unu figs":
-                Statistics().print_unused_figures()
-            elif data == "und":
-                Statistics().print_undefined_references()
-            elif data == "backup":
-                Statistics().backup_first_start_of_day()
-            else:
-                self.print("Unknown command: {}".format(data))
-        clientsock.close()
+        # commands are separated by newlines; the last command may also be terminated by closing the connection
+        with clientsock, clientsock.makefile('rb') as commands:
+            for line in commands:
+                data = line.strip().decode()
+                if not data:
+                    continue
+                self.handle_command(data)
+
+    def handle_command(self, data):
+        clear_screen()
+        # parsed results are kept between requests as long as the underlying files don't change
+        self.stats.refresh()
+        if data == "toc":
+            self.stats.print_table_of_content()
+        elif data == "lot":
+            self.stats.print_list_of_tables()
+        elif data == "lof":
+            self.stats.print_list_of_figures()
+        elif data == "unu" or data == "unu refs":
+            self.stats.print_unused_references()
+        elif data == "unu figs":
+            self.stats.print_unused_figures()
+        elif data == "und":
+            self.stats.print_undefined_references()
+        elif data == "backup":
+            self.stats.backup_first_start_of_day()
+        else:
+            self.print("Unknown command: {}".format(data))
         
 if __name__ == "__main__":
-    os.system("cls")
+    clear_screen()
     StatsServer().loop_forever()
\ No newline at end of file